@@ -1,4 +1,4 @@
-from camille.source.bazefetcher import _tidy_frame
+from camille.source.bazefetcher import _read_file
 import datetime
 import errno
 import os
@@ -36,13 +36,13 @@ def _merge(ts, into, overwrite=False, fill=False):
     if not overlap or overwrite:
         eps = datetime.timedelta(microseconds=1)
         ts = pd.concat([
-            into.value[:ts_start - eps],
+            into[:ts_start - eps],
             ts,
-            into.value[ts_end + eps:]
+            into[ts_end + eps:]
         ])
     elif fill:
         idx = ~ts.index.isin(into.index)
-        ts = pd.concat([into.value, ts[idx]]).sort_index()
+        ts = pd.concat([into, ts[idx]]).sort_index()
     else:
         msg = (
             'you are attempting to write data for a time interval'
@@ -54,6 +54,12 @@ def _merge(ts, into, overwrite=False, fill=False):
     return ts
 
 
+_partitions = {
+    'D': datetime.timedelta(days=1),
+    'H': datetime.timedelta(hours=1),
+}
+
+
 class Bazefetcher:
     """Bazefetcher
 
@@ -64,6 +70,14 @@ class Bazefetcher:
     ----------
     root : str or path-like
         Path to the bazefetcher root directory
+    tzinfo : datetime.tzinfo, optional
+        Timezone of the data
+    partition : {'D', 'H'}, optional
+        Write one file per day (default) or per hour. Smaller files make
+        overlapping writes cheaper, as only the files that are written to are
+        read back and rewritten. A tag must always be written with the same
+        partition, writing to a tag with files of another partition raises a
+        ValueError
 
     Examples
     --------
@@ -109,7 +123,7 @@ class Bazefetcher:
     Name: value, dtype: int64
     """
 
-    def __init__(self, root, tzinfo=pytz.utc):
+    def __init__(self, root, tzinfo=pytz.utc, partition='D'):
 
         if not os.path.isdir(root):
             raise ValueError('{} is not a directory'.format(root))
@@ -117,8 +131,13 @@ class Bazefetcher:
         if not isinstance(tzinfo, datetime.tzinfo):
             raise ValueError('tzinfo must be instance of datetime.tzinfo')
 
+        if partition not in _partitions:
+            raise ValueError('partition must be one of {}'.format(
+                ', '.join(_partitions)))
+
         self.root = root
         self.tzinfo = tzinfo
+        self.partition = partition
 
     def __call__(self,
                  series,
@@ -150,6 +169,52 @@ class Bazefetcher:
             Default is False
         """
 
+        self.write_many(series, tag, [(start, end)], overwrite, fill)
+
+    def _overlapping(self, tag, starts):
+        """
+        The paths of the files of the other partition that would overlap the
+        files starting at starts. File names are fixed by their interval, so
+        they are checked directly rather than by listing the tag directory
+        """
+        day = _partitions['D']
+        hour = _partitions['H']
+        days = {d.floor('D').to_pydatetime() for d in starts}
+        if self.partition == 'H':
+            intervals = [(s, s + day) for s in days]
+        else:
+            intervals = [
+                (s + i * hour, s + (i + 1) * hour)
+                for s in days
+                for i in range(24)
+            ]
+        return {
+            _generate_tag_location(self.root, tag, s, e, suffix='.json.gz')
+            for s, e in intervals
+        }
+
+    def write_many(self, series, tag, intervals, overwrite=False, fill=False):
+        """
+        Write several intervals of series to tag, with the same result as
+        calling the object once per interval, in order. Each affected file is
+        only read and written once
+
+        Parameters
+        ----------
+        series : pandas.Series
+            Time series to write. The time series index must be timezone
+            aware
+        tag : str
+            The tag of the series to write
+        intervals : list of (datetime.datetime, datetime.datetime)
+            The (start, end) intervals of series to write. None in place of a
+            date means the first or last sample of series
+        overwrite : bool, optional
+            As for __call__
+        fill : bool, optional
+            As for __call__
+        """
+
         if tag is None:
             raise ValueError('tag must be specified')
 
@@ -157,20 +222,37 @@ class Bazefetcher:
             return
 
         eps = datetime.timedelta(microseconds=1)
-        if start is None: start = series.index[0].to_pydatetime()
-        if end is None: end = series.index[-1].to_pydatetime() + eps
-
-        if start.tzinfo is None or end.tzinfo is None:
-            raise ValueError('dates must be timezone aware')
-
-        if not start <= end:
-            raise ValueError('start_date must be earlier than end_date')
-
-        series = series[start:end-eps].tz_convert(pytz.utc)
-
-        for d, view in series.groupby(series.index.date):
-            s = datetime.datetime(d.year, d.month, d.day, tzinfo=pytz.utc)
-            e = s + datetime.timedelta(days=1)
+        length = _partitions[self.partition]
+
+        # The views to merge into each file, in write order
+        files = {}
+        for start, end in intervals:
+            if start is None: start = series.index[0].to_pydatetime()
+            if end is None: end = series.index[-1].to_pydatetime() + eps
+
+            if start.tzinfo is None or end.tzinfo is None:
+                raise ValueError('dates must be timezone aware')
+
+            if not start <= end:
+                raise ValueError('start_date must be earlier than end_date')
+
+            interval = series[start:end-eps].tz_convert(pytz.utc)
+            groups = interval.groupby(interval.index.floor(self.partition))
+            for d, view in groups:
+                files.setdefault(d, []).append(view)
+
+        # Files of another partition would overlap the ones written here, and
+        # the reader would return their samples twice
+        if any(map(os.path.exists, self._overlapping(tag, files))):
+            msg = (
+                'tag {} has files of another partition than {}, a tag'
+                ' must always be written with the same partition'
+            ).format(tag, self.partition)
+            raise ValueError(msg)
+
+        for d, views in files.items():
+            s = d.to_pydatetime()
+            e = s + length
             tag_path = _generate_tag_location(self.root,
                                               tag,
                                               s,
@@ -186,15 +268,24 @@ class Bazefetcher:
                         raise
 
             try:
-                old = pd.read_json(tag_path)
+                with open(tag_path, 'rb') as f:
+                    old = _read_file(f, tzinfo=pytz.utc)
             except (FileNotFoundError,
                     ValueError,
                     pd.errors.EmptyDataError):
-                old = pd.DataFrame()
-
-            _tidy_frame(old, tzinfo=pytz.utc)
-            if not old.empty:
-                view = _merge(view, into=old, overwrite=overwrite, fill=fill)
-
-            view = pd.DataFrame({'t': view.index, 'v': view.values})
-            view.to_json(tag_path, compression='gzip', orient='records')
+                old = None
+
+            for view in views:
+                if old is not None and not old.empty:
+                    view = _merge(view,
+                                  into=old,
+                                  overwrite=overwrite,
+                                  fill=fill)
+                old = view
+
+            view = pd.DataFrame({'t': old.index, 'v': old.values})
+            # Files are small and rewritten on every write to the same day,
+            # so favour compression speed over size
+            view.to_json(tag_path,
+                         compression={'method': 'gzip', 'compresslevel': 1},
+                         orient='records')
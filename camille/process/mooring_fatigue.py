@@ -3,7 +3,6 @@ import math
 import numpy as np
 import rainflow
 import pandas as pd
-from scipy.interpolate import interp1d
 
 def sncurve(stress, k=None, logA=None, m=None, t=0, tref=25.0):
     """SN Curve
@@ -12,8 +11,9 @@ def sncurve(stress, k=None, logA=None, m=None, t=0, tref=25.0):
 
     Parameters
     ----------
-    stress : float or list of float
-        Stress range [MPa]
+    stress : float or array_like of float
+        Stress range [MPa]. All stress ranges are evaluated in one go, so pass
+        every cycle at once rather than calling per cycle
     k : float
         Thickness exponent on fatigue strength
     logA : float or list of float
@@ -28,31 +28,48 @@ def sncurve(stress, k=None, logA=None, m=None, t=0, tref=25.0):
 
     Returns
     -------
-    float or list of floats
+    float or numpy.ndarray of float
         Number of stress cycles before failure
 
     """
-    alpha = max((t / tref) ** k, 1)
-    stress = np.array(stress) * alpha
+    return _sncurve(k=k, logA=logA, m=m, t=t, tref=tref)(stress)
 
-    try:
-        x = np.zeros(len(logA) + 1)
-        y = np.zeros(len(logA) + 1)
 
-        [x[0],x[-1]] = [12, -9]
-        [y[0],y[-1]] = [logA[0] - m[0] * 12, logA[-1] + m[ - 1] * 9]
+def _sncurve(k=None, logA=None, m=None, t=0, tref=25.0):
+    """
+    sncurve with the curve parameters bound, so that the breakpoints are
+    computed once for repeated lookups
+    """
+    alpha = max((t / tref) ** k, 1)
 
-        for i in range(len(logA)-1, 0, -1):
-            x[i] = (logA[i] - logA[i - 1]) / (m[i] - m[i - 1])
-            y[i] = logA[i] - m[i] * x[i]
+    logA = np.atleast_1d(np.asarray(logA, dtype=float))
+    m = np.atleast_1d(np.asarray(m, dtype=float))
 
-    except TypeError:
-        x = np.array([12, -9])
-        y = np.array([logA - m * 12, logA + m * 9])
+    # Breakpoints of the piecewise linear curve in log-log space, with the
+    # end points at log S = 12 and log S = -9
+    x = np.empty(len(logA) + 1)
+    y = np.empty(len(logA) + 1)
+    x[0], x[-1] = 12, -9
+    y[0], y[-1] = logA[0] - m[0] * 12, logA[-1] + m[-1] * 9
+    x[1:-1] = (logA[1:] - logA[:-1]) / (m[1:] - m[:-1])
+    y[1:-1] = logA[1:] - m[1:] * x[1:-1]
 
-    interp = interp1d(x, y, kind='linear', fill_value='extrapolate')
+    # np.interp wants increasing x, and clamps outside [x[0], x[-1]], so
+    # extend the end segments linearly to keep extrapolating. Intersections
+    # may fall outside the end points, so sort rather than reverse
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    lo = (y[1] - y[0]) / (x[1] - x[0])
+    hi = (y[-1] - y[-2]) / (x[-1] - x[-2])
 
-    return 10 ** interp(np.log10(stress))
+    def curve(stress):
+        logS = np.log10(np.asarray(stress, dtype=np.float64) * alpha)
+        logN = np.interp(logS, x, y)
+        logN = np.where(logS < x[0], y[0] + (logS - x[0]) * lo, logN)
+        logN = np.where(logS > x[-1], y[-1] + (logS - x[-1]) * hi, logN)
+        return 10 ** logN
+
+    return curve
 
 
 def process(series, window_length=3600, fs=5, sn_curve=None):
@@ -97,6 +114,7 @@ def process(series, window_length=3600, fs=5, sn_curve=None):
 
     damage = np.empty(n_windows)
     index = []
+    curve = _sncurve(**sn_curve)
 
     for w in range(0, n_windows):
         start_idx, end_idx = w * window, (w + 1) * window
@@ -108,7 +126,7 @@ def process(series, window_length=3600, fs=5, sn_curve=None):
             continue
 
         stress = _calculate_stress(data)
-        dmg = _calc_damage(stress, sn_curve)
+        dmg = _damage(stress, curve)
         seconds_per_year = 3600 * 24 * 365
         dmb_calc = seconds_per_year / window_length * dmg
         damage[w] = dmb_calc
@@ -122,6 +140,10 @@ def _calculate_stress(data):
 
 
 def _calc_damage(data, sn_curve):
+    return _damage(data, _sncurve(**sn_curve))
+
+
+def _damage(data, curve):
     stress_ranges = []
     cycles = []
     for low, high, mult in rainflow.extract_cycles(data, True, True):
@@ -130,7 +152,7 @@ def _calc_damage(data, sn_curve):
             cycles.append(mult)
             stress_ranges.append( 2*amplitude )
 
-    N = sncurve(stress_ranges, **sn_curve)
+    N = curve(stress_ranges)
     damage = sum(sorted(cycles/N))
     return damage
 
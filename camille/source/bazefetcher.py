@@ -1,8 +1,13 @@
 from ..util import utcdate
 from abc import ABC
 from abc import abstractmethod
+import concurrent.futures
 import contextlib
+from io import StringIO
 import datetime
+import itertools
+import numpy as np
+import operator
 import os
 import pandas as pd
 import paramiko
@@ -12,6 +17,17 @@ import re
 import stat
 import threading
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+try:
+    # isal's SIMD accelerated inflate is several times faster than zlib's
+    from isal.igzip import decompress as _gzip_decompress
+except ImportError:
+    from gzip import decompress as _gzip_decompress
+
 
 class AbstractIO(ABC):
     @abstractmethod
@@ -32,9 +48,10 @@ class RemoteIO(AbstractIO):
         Internal helper object providing an interface similar to that of
         `pathlib.Path` over ssh
         """
-        def __init__(self, owner, path=None):
+        def __init__(self, owner, path=None, attr=None):
             self.owner = owner
             self._path = path
+            self._attr = attr
 
         def __getattr__(self, name):
             """
@@ -62,6 +79,10 @@ class RemoteIO(AbstractIO):
             return self.path.name
 
         def is_dir(self):
+            # Entries from iterdir already carry their attributes, saving a
+            # round trip. Symlinks are still resolved by the server
+            if self._attr is not None and not stat.S_ISLNK(self._attr.st_mode):
+                return bool(stat.S_ISDIR(self._attr.st_mode))
             try:
                 remote_stat = self.owner.sftp.stat(str(self.path))
                 return bool(stat.S_ISDIR(remote_stat.st_mode))
@@ -69,7 +90,12 @@ class RemoteIO(AbstractIO):
                 return False
 
         def iterdir(self):
-            return (self / f for f in self.owner.sftp.listdir(str(self.path)))
+            # listdir_attr costs the same round trip as listdir, and the
+            # attributes are kept around so that open() knows the file size
+            return (
+                self._replace(_path=self.path / attr.filename, _attr=attr)
+                for attr in self.owner.sftp.listdir_attr(str(self.path))
+            )
 
         def open(self,
                  mode='r',
@@ -77,7 +103,13 @@ class RemoteIO(AbstractIO):
                  encoding=None,
                  errors=None,
                  newline=None):
-            return self.owner.sftp.open(str(self.path), mode)
+            f = self.owner.sftp.open(str(self.path), mode)
+            if 'r' in mode:
+                # Plain reads are synchronous, one round trip per 32 KiB
+                # block. Prefetching pipelines the requests in the background
+                size = self._attr.st_size if self._attr is not None else None
+                f.prefetch(size)
+            return f
 
         def _replace(self, **kwargs):
             """
@@ -112,7 +144,7 @@ class RemoteIO(AbstractIO):
             return str(self) < str(other)
 
         def __truediv__(self, other):
-            return self._replace(_path=self.path / other)
+            return self._replace(_path=self.path / other, _attr=None)
 
         def __repr__(self):
             return f'{self.__class__.__name__}<{str(self.path)}>'
@@ -206,132 +238,244 @@ class TagNotFoundError(ValueError):
     pass
 
 
-date_pattern = r'[0-9]{4}-[0-9]{2}-[0-9]{2}'
-time_pattern = r'[0-9]{2}\.[0-9]{2}\.[0-9]{2}\+[0-9]{2}\.[0-9]{2}'
-dt_pattern = date_pattern + 'T' + time_pattern
-fn_tail_pattern = '_' + dt_pattern + '_' + dt_pattern + r'\.json\.gz$'
+_fn_suffix = '.json.gz'
+# _YYYY-MM-DDTHH.MM.SS+HH.MM_YYYY-MM-DDTHH.MM.SS+HH.MM.json.gz
+_fn_tail_len = 1 + 25 + 1 + 25 + len(_fn_suffix)
+
+
+_fn_date_regex = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})T'
+    r'([0-9]{2})\.([0-9]{2})\.([0-9]{2})([+-][0-9]{2})\.([0-9]{2})'
+)
+_fn_tz_cache = {}
+
+
+def _parse_fn_date(date_str):
+    # strptime is slow, and it is called for every file in a tag directory.
+    # The format is fixed, so pick it apart with a regex instead
+    m = _fn_date_regex.match(date_str)
+    if m is None:
+        raise ValueError(f'Invalid date in file name: {date_str}')
+    y, mo, d, h, mi, sec, tz_h, tz_m = m.groups()
+    tz = _fn_tz_cache.get((tz_h, tz_m))
+    if tz is None:
+        minutes = int(tz_m) if tz_h[0] == '+' else -int(tz_m)
+        offset = datetime.timedelta(hours=int(tz_h), minutes=minutes)
+        tz = _fn_tz_cache[(tz_h, tz_m)] = datetime.timezone(offset)
+    return datetime.datetime(
+        int(y), int(mo), int(d), int(h), int(mi), int(sec), tzinfo=tz)
 
 
 def _fn_start_date(fn):
     # File names are on the form:
     #     |- start_date ----------| |- end_date ------------|
     # tag_YYYY-MM-DDTHH.MM.SS+HH.MM_YYYY-MM-DDTHH.MM.SS+HH.MM.json.gz
-    date_str = fn.split('_')[-2] # extract start date
-    date_str = date_str.replace('.', '') # UTC offset does not support '.'
-    date_fmt = "%Y-%m-%dT%H%M%S%z"
-    return datetime.datetime.strptime(date_str, date_fmt)
+    return _parse_fn_date(fn.split('_')[-2])
 
 
 def _fn_end_date(fn):
-    date_str = fn.split('_')[-1] # extract start date
-    date_str = date_str.replace('.', '') # UTC offset does not support '.'
-    date_fmt = "%Y-%m-%dT%H%M%S%zjsongz"
-    return datetime.datetime.strptime(date_str, date_fmt)
+    return _parse_fn_date(fn.split('_')[-1])
 
 
-def _tidy_frame(df, tzinfo):
-    if df is None or df.empty or 't' not in df.columns:
-        df.drop(df.index, inplace=True)
-        df.insert(0, 't', [])
-        df.insert(1, 'v', [])
-    df.rename(columns={
-        't': 'time',
-        'v': 'value',
-        }, inplace=True)
+def _time_index(time, tzinfo):
+    # Timestamps are integer milliseconds. Scaling them to nanoseconds and
+    # viewing the result as datetime64[ns] is much cheaper than having
+    # pd.to_datetime parse them, and skips any further unit conversion
+    ns = np.asarray(time, dtype='int64') * 1_000_000
+    index = pd.DatetimeIndex(ns.view('datetime64[ns]'), name='time')
+    return index.tz_localize(tzinfo)
 
-    df.time = pd.to_datetime(df.time, unit='ms')
-    df.set_index('time', inplace=True)
-    df.index = df.index.tz_localize(tzinfo)
-    df.sort_index(inplace=True)
 
+def _read_file(buffer, tzinfo):
+    """
+    Reads a single gzipped bazefetcher file into a sorted, timezone aware
+    series
+    """
+    return _make_series(*_parse_file(buffer.read()), tzinfo)
+
+
+def _parse_file(data):
+    """
+    Parses the gzipped contents of a bazefetcher file into an int64 array of
+    millisecond timestamps and a list of values
+    """
+    raw = _gzip_decompress(data)
+    # Files are lists of {"t": <ms>, "v": <value>} records. Decoding them
+    # directly skips the dtype inference and frame construction of
+    # pd.read_json, which is several times slower
+    try:
+        records = _json_loads(raw)
+        time = np.fromiter((r['t'] for r in records),
+                           dtype='int64',
+                           count=len(records))
+        values = [r['v'] for r in records]
+    except (ValueError, TypeError, KeyError):
+        # Anything else is left to the more lenient pandas parser
+        df = pd.read_json(StringIO(raw.decode('utf-8')),
+                          dtype=False,
+                          convert_dates=False)
+        if df.empty or 't' not in df.columns or 'v' not in df.columns:
+            return np.empty(0, dtype='int64'), []
+        time = df['t'].to_numpy(dtype='int64')
+        values = df['v'].tolist()
+    return time, values
+
+
+def _make_series(time, values, tzinfo):
+    ts = pd.Series(values,
+                   index=_time_index(time, tzinfo),
+                   name='value',
+                   dtype=None if len(values) > 0 else 'float64')
+    if not ts.index.is_monotonic_increasing:
+        ts.sort_index(inplace=True)
+    return ts
+
+
+def _read_files(buffers, tzinfo):
+    """
+    Reads files into a single series
+
+    zlib releases the GIL while inflating, so with several cores the files
+    are decompressed concurrently, one worker per core. JSON parsing holds the
+    GIL and does not gain from the threads. The buffers themselves are read
+    from this thread, as a paramiko SFTP session must not be read from several
+    threads at once.
 
-def _get_files(io, fn_regex, date_pred):
+    The per-file arrays are joined before the series is built, so there is
+    only one index construction, dtype inference and sort
+    """
+    data = [buffer.read() for buffer in buffers]
+    max_workers = min(len(data), os.cpu_count() or 1)
+    if max_workers <= 1:
+        parsed = [_parse_file(x) for x in data]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            parsed = list(executor.map(_parse_file, data))
+
+    if not parsed:
+        return _make_series(np.empty(0, dtype='int64'), [], tzinfo)
+    time = np.concatenate([t for t, _ in parsed])
+    values = list(itertools.chain.from_iterable(v for _, v in parsed))
+    return _make_series(time, values, tzinfo)
+
+
+def _get_files(io, tag, date_pred):
     """
-    Gets all possible files with tag under io which satisfy
-    fn_regex and date_pred
+    Gets all possible files with tag under io which satisfy date_pred
+
+    Returns a list of (start_date, end_date, file) tuples, so that the dates
+    in the file names are parsed only once. date_pred is called with the
+    start and end date of each file.
     """
-    file_contexts = [f for f in io.iterdir()
-                     if fn_regex.match(f.name) and date_pred(f.name)]
-    return file_contexts
+    # The file name grammar is fixed, so cheap string checks rule out most
+    # foreign files, and the date parser rejects the rest
+    prefix = tag + '_'
+    length = len(tag) + _fn_tail_len
+    if isinstance(io, pathlib.PurePath):
+        # Path.iterdir builds a Path for every entry. Scan the names, and only
+        # build paths for the files that are kept
+        with os.scandir(io) as it:
+            children = [(e.name, None) for e in it]
+    else:
+        children = [(f.name, f) for f in io.iterdir()]
+
+    entries = []
+    for fn, f in children:
+        if (len(fn) != length
+                or not fn.endswith(_fn_suffix)
+                or not fn.startswith(prefix)):
+            continue
+        try:
+            start, end = _fn_start_date(fn), _fn_end_date(fn)
+        except ValueError:
+            continue
+        if date_pred(start, end):
+            entries.append((start, end, io / fn if f is None else f))
+    return entries
 
 
-def _get_fn_regex(tag):
-    return re.compile(re.escape(tag) + fn_tail_pattern)
+def _split_files(io, tag, start_dt, end_dt):
+    """
+    Lists the files with tag under io once, and splits them into the files
+    ending before start_dt, the files overlapping [start_dt, end_dt), and the
+    files starting after end_dt. Only the overlapping files are sorted by
+    start date, as the others are only needed when snapping
+    """
+    before, between, after = [], [], []
+    for entry in _get_files(io, tag, lambda start, end: True):
+        start, end, _ = entry
+        if start < end_dt and end > start_dt:
+            between.append(entry)
+        elif end <= start_dt:
+            before.append(entry)
+        else:
+            after.append(entry)
+    between.sort(key=operator.itemgetter(0))
+    return before, between, after
 
 
 def _get_files_between_start_and_end(io, tag, start_dt, end_dt):
-    return _get_files(
-        io,
-        _get_fn_regex(tag),
-        lambda fn: _fn_start_date(fn) < end_dt and _fn_end_date(fn) > start_dt
-    )
+    return _split_files(io, tag, start_dt, end_dt)[1]
 
 
-def _extend_bwd(io, tag, start_date, df, fn_regex, tzinfo):
+def _extend_bwd(files, start_date, ts, tzinfo):
     """
     Extends the range to include the last sample before or at the same time
-    as the start of time range
+    as the start of time range. files are the candidates ending before
+    start_date
     """
 
-    if df.index.min() <= start_date:
-        start_date = df[:start_date].index.max()
-        return df, start_date
+    # ts is sorted, so the snapped sample is found by position rather than
+    # by slicing and scanning for the extremum
+    if not ts.empty and ts.index[0] <= start_date:
+        pos = ts.index.searchsorted(start_date, side='right') - 1
+        return ts, ts.index[pos]
 
-    files = _get_files(io, fn_regex, lambda fn: _fn_end_date(fn) <= start_date)
+    files = sorted(files, key=operator.itemgetter(1), reverse=True)
 
-    while True:
-        if not files: break
+    for _, _, prev_f in files:
+        with prev_f.open(mode='rb') as buffer:
+            tmp_ts = _read_file(buffer, tzinfo)
 
-        prev_f = max(files, key=lambda x: _fn_end_date(x.name))
-        tmp_df = pd.read_json(prev_f, compression='gzip')
-
-        if tmp_df.empty:
-            files.remove(prev_f)
+        if tmp_ts.empty:
             continue
 
-        _tidy_frame(tmp_df, tzinfo)
-
-        start_date = tmp_df.index.max()
-
-        df.loc[start_date] = tmp_df.loc[start_date]
-        df.sort_index(inplace=True)
+        # The sample precedes everything in ts, so prepending it keeps ts
+        # sorted
+        sample = tmp_ts.iloc[-1:]
+        start_date = sample.index[0]
+        ts = pd.concat([sample, ts]) if not ts.empty else sample
         break
 
-    return df, start_date
+    return ts, start_date
 
 
-def _extend_fwd(io, tag, end_date, df, fn_regex, tzinfo):
+def _extend_fwd(files, end_date, ts, tzinfo):
     """
     Extends the range to include the next sample after or at the same time
-    as the end of time range
+    as the end of time range. files are the candidates starting after
+    end_date
     """
 
-    if df.index.max() >= end_date:
-        end_date = df[end_date:].index.min()
-        return df, end_date + datetime.timedelta(microseconds=1)
+    if not ts.empty and ts.index[-1] >= end_date:
+        pos = ts.index.searchsorted(end_date, side='left')
+        return ts, ts.index[pos] + datetime.timedelta(microseconds=1)
 
-    files = _get_files(io, fn_regex, lambda fn: _fn_start_date(fn) >= end_date)
+    files = sorted(files, key=operator.itemgetter(0))
 
-    while True:
-        if not files: break
+    for _, _, next_f in files:
+        with next_f.open(mode='rb') as buffer:
+            tmp_ts = _read_file(buffer, tzinfo)
 
-        next_f = min(files, key=lambda x: _fn_start_date(x.name))
-        tmp_df = pd.read_json(next_f, compression='gzip')
-
-        if tmp_df.empty:
-            files.remove(next_f)
+        if tmp_ts.empty:
             continue
 
-        _tidy_frame(tmp_df, tzinfo)
-
-        end_date = tmp_df.index.min()
-
-        df.loc[end_date] = tmp_df.loc[end_date]
-        df.sort_index(inplace=True)
-        end_date += datetime.timedelta(microseconds=1)
+        sample = tmp_ts.iloc[:1]
+        end_date = sample.index[0] + datetime.timedelta(microseconds=1)
+        ts = pd.concat([ts, sample]) if not ts.empty else sample
         break
 
-    return df, end_date
+    return ts, end_date
 
 
 class Bazefetcher:
@@ -391,20 +535,73 @@ class Bazefetcher:
 
         return LocalIO(path)
 
+    @staticmethod
+    def _find_tags(io, tags):
+        """
+        The tags that are directories under io, with a single listing of io
+
+        Nested tags are not visible in the listing of the root, so they are
+        looked up directly. Listing pays off when many tags are looked up at
+        once, a single tag is cheaper to stat
+        """
+        try:
+            found = [
+                f.name for f in io.iterdir()
+                if f.name in tags and f.is_dir()
+            ]
+        except FileNotFoundError:
+            return []
+        found += [
+            tag for tag in tags
+            if '/' in tag and (io / tag).is_dir()
+        ]
+        return found
+
     @contextlib.contextmanager
     def _tag_protocol(self, tag):
-        protocols = iter(self.srcs)
-        while True:
-            try:
-                protocol = next(protocols)
-                with protocol as io:
-                    io = io / tag
-                    if io.is_dir():
-                        yield io
-                        break
-            except StopIteration:
-                msg = f'Tag {tag} not found in {self.srcs}'
-                raise TagNotFoundError(msg)
+        # A single tag is found with one stat per root, which is far cheaper
+        # than listing roots with many tags. The root is kept open for
+        # reading, which saves reconnecting to remote roots
+        for protocol in self.srcs:
+            with protocol as io:
+                io = io / tag
+                if io.is_dir():
+                    yield io
+                    return
+
+        msg = f'Tag {tag} not found in {self.srcs}'
+        raise TagNotFoundError(msg)
+
+    def _resolve_tags(self, tags):
+        """
+        Find the first root containing each of the tags
+
+        Every root is listed at most once, however many tags are looked up,
+        which keeps the number of round trips to remote roots down.
+
+        Parameters
+        ----------
+        tags : iterable of str
+
+        Returns
+        -------
+        dict
+            Mapping from tag to protocol for the tags that were found
+        """
+        missing = set(tags)
+        resolved = {}
+        for protocol in self.srcs:
+            if not missing:
+                break
+            with protocol as io:
+                found = self._find_tags(io, missing)
+            for tag in found:
+                resolved[tag] = protocol
+            missing.difference_update(found)
+        return resolved
+
+    def __contains__(self, tag):
+        return tag in self._resolve_tags([tag])
 
     def __call__(self,
                  tag,
@@ -436,43 +633,34 @@ class Bazefetcher:
             raise ValueError('start_date must be earlier than end_date')
 
         with self._tag_protocol(tag) as io:
-            files = _get_files_between_start_and_end(io,
-                                                     tag,
-                                                     start_date,
-                                                     end_date)
+            # The neighbouring files are kept for snapping, which saves
+            # listing the directory again
+            before, files, after = _split_files(io,
+                                                tag,
+                                                start_date,
+                                                end_date)
+            # Files cover disjoint intervals, so joining their samples in
+            # start date order usually gives sorted times, and no sort
             with contextlib.ExitStack() as exit_stack:
-                L = [
-                    pd.read_json(buffer, compression='gzip') for buffer in (
-                        exit_stack.enter_context(f.open(mode='rb'))
-                        for f in files
-                    )
+                # Open all files before reading any of them, so that remote
+                # files are prefetched concurrently
+                buffers = [
+                    exit_stack.enter_context(f.open(mode='rb'))
+                    for _, _, f in files
                 ]
-            df = pd.concat(L, sort=True) if len(L) > 0 else pd.DataFrame()
-
-            _tidy_frame(df, self.tzinfo)
-            fn_regex = _get_fn_regex(tag)
+                ts = _read_files(buffers, self.tzinfo)
 
             if snap == 'left' or snap == 'both':
-                df, start_date = _extend_bwd(io,
-                                             tag,
+                ts, start_date = _extend_bwd(before,
                                              start_date,
-                                             df,
-                                             fn_regex,
+                                             ts,
                                              self.tzinfo)
 
             if snap == 'right' or snap == 'both':
-                df, end_date = _extend_fwd(io,
-                                           tag,
+                ts, end_date = _extend_fwd(after,
                                            end_date,
-                                           df,
-                                           fn_regex,
+                                           ts,
                                            self.tzinfo)
 
-        try:
-            eps = datetime.timedelta(microseconds=1)
-            ts = df.value
-            ts = ts[start_date:end_date - eps]
-        except KeyError:
-            pass
-
-        return ts
+        eps = datetime.timedelta(microseconds=1)
+        return ts[start_date:end_date - eps]
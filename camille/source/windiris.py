@@ -1,16 +1,58 @@
+import math
 import sqlite3
 import os
+import threading
 import pandas as pd
-from math import radians
 import re
 import pytz
 
 
+_column_names = {
+    'LOS Index': 'los_id',
+    'Distance': 'distance',
+    'RWS': 'radial_windspeed',
+    'RWS Status': 'status',
+    'Tilt': 'pitch',
+    'Roll': 'roll',
+}
+_degree_columns = ('Tilt', 'Roll')
+
+
+_unsafe_chars = re.compile('[^A-Za-z0-9,.]')
+
+
 def _to_string(x):
-    x = re.sub('[^A-Za-z0-9,.]', '', str(x))
+    if isinstance(x, (list, tuple)) and all(type(v) is int for v in x):
+        # The common case of a list of ids needs no sanitizing
+        return '(' + ','.join(map(str, x)) + ')'
+    x = _unsafe_chars.sub('', str(x))
     return '(' + x + ')'
 
 
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _projection(connection, table):
+    """
+    Column list selecting every column of table, with the camille names and
+    with tilt and roll converted to radians by sqlite
+    """
+    cursor = connection.execute('SELECT * FROM ' + table + ' LIMIT 0')  # nosec
+    columns = [d[0] for d in cursor.description]
+    cursor.close()
+
+    projection = []
+    for column in columns:
+        expr = _quote(column)
+        if column in _degree_columns:
+            expr += ' * ' + repr(math.pi / 180)
+        if column in _column_names:
+            expr += ' AS ' + _column_names[column]
+        projection.append(expr)
+    return ', '.join(projection)
+
+
 def _sqlite(start_date,
             end_date,
             connection,
@@ -20,15 +62,17 @@ def _sqlite(start_date,
             distance=None,
             status=None):
 
+    # Dates are bound as parameters rather than formatted into the query.
+    # They are compared as text, so they keep the str(datetime) format of
+    # the stored timestamps, minus the trailing '+00:00'
     query_params = []
+    bindings = []
     if start_date is not None:
-        query_params.append(' Timestamp >= "{}" '
-                            .format(str(start_date.astimezone(pytz.utc)
-                                        .replace(tzinfo=None))))
+        query_params.append(' Timestamp >= ? ')
+        bindings.append(str(start_date.astimezone(pytz.utc))[:-6])
     if end_date is not None:
-        query_params.append(' Timestamp < "{}" '
-                            .format(str(end_date.astimezone(pytz.utc)
-                                        .replace(tzinfo=None))))
+        query_params.append(' Timestamp < ? ')
+        bindings.append(str(end_date.astimezone(pytz.utc))[:-6])
     if los_id is not None:
         query_params.append(' "LOS Index" IN {} '.format(_to_string(los_id)))
     if distance is not None:
@@ -36,36 +80,39 @@ def _sqlite(start_date,
     if status is not None:
         query_params.append(' "RWS Status" IN {} '.format(_to_string(status)))
 
+    table = _to_string(installation)
     query = (
-        'SELECT * FROM ' + _to_string(installation)  # nosec
+        'SELECT ' + _projection(connection, table)
+        + ' FROM ' + table  # nosec
         + ('' if len(query_params) == 0
            else ' WHERE ' + 'AND'.join(query_params))
-        + ';'
+        # Timestamp is indexed, so sqlite returns the rows in order without
+        # sorting them, and there is no need for sort_index afterwards
+        + ' ORDER BY Timestamp;'
     )
 
-    df = pd.read_sql_query(query, connection,
-                           index_col='Timestamp',
-                           parse_dates={
-                                'Timestamp': {'utc': True}
-                           }).sort_index()
-
-    df.rename(columns={
-        'LOS Index': 'los_id',
-        'Distance': 'distance',
-        'RWS': 'radial_windspeed',
-        'RWS Status': 'status',
-        'Tilt': 'pitch',
-        'Roll': 'roll',
-    }, inplace=True)
-    df.index.name = 'time'
-    df.index = df.index.tz_convert(tzinfo)
-    df.pitch = df.pitch.apply(radians)
-    df.roll = df.roll.apply(radians)
+    # Build the frame straight from the cursor rows. Timestamps are ISO
+    # strings, and converting them as one array with to_datetime takes the
+    # vectorized parser, where read_sql_query's parse_dates goes per cell
+    cursor = connection.execute(query, bindings)
+    try:
+        columns = [d[0] for d in cursor.description]
+        df = pd.DataFrame.from_records(cursor.fetchall(),
+                                       columns=columns,
+                                       coerce_float=True)
+    finally:
+        cursor.close()
+
+    time = pd.to_datetime(df.pop('Timestamp').to_numpy(), utc=True, cache=True)
+    df.index = pd.DatetimeIndex(time, name='time').tz_convert(tzinfo)
 
     return df
 
 
-def windiris(root, tzinfo=pytz.utc):
+def windiris(root,
+             tzinfo=pytz.utc,
+             mmap_size=64 * 2**20,
+             cache_size=8 * 2**20):
     """
     Creates a function that can be used to read windiris data from
     specified root directory
@@ -76,6 +123,12 @@ def windiris(root, tzinfo=pytz.utc):
         Path to windiris data root directory
     tzinfo : datetime.tzinfo
         Timezone format for returned timeseries
+    mmap_size : int, optional
+        Bytes of each database to memory map, default 64 MiB. 0 disables
+        memory mapping
+    cache_size : int, optional
+        Bytes of sqlite page cache per connection, default 8 MiB
+
     Returns
     -------
     function (str, datetime.datetime, datetime.datetime, str, str, str)
@@ -109,10 +162,46 @@ def windiris(root, tzinfo=pytz.utc):
     >>> end = datetime(2018, 6, 12, tzinfo=utc)
     >>> df = wi('wind', start, end)
 
+    Connections to the databases are kept open between calls, and are closed
+    with `wi.close()`. There is one connection per thread and installation
+    read from, each of which can hold up to `cache_size` bytes of page cache
+    and map `mmap_size` bytes of address space. Connections are not closed
+    when their thread exits, so those opened by short-lived threads, such as
+    pool workers, stay open until `wi.close()` is called
+
     """
     if not os.path.isdir(root):
         raise ValueError('{} is not a directory'.format(root))
 
+    mmap_size, cache_size = int(mmap_size), int(cache_size)
+    if mmap_size < 0 or cache_size < 0:
+        raise ValueError('mmap_size and cache_size must be non-negative')
+
+    connections = {}
+    lock = threading.Lock()
+
+    def connect(f):
+        # Connections are kept per thread, so that no connection is used by
+        # two threads at once. Any thread may close them, though, so the
+        # dict is only touched under the lock
+        key = (threading.get_ident(), f)
+        with lock:
+            conn = connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(f, check_same_thread=False)
+            # The databases are only ever read. Memory map them and give
+            # sqlite a page cache, so range scans are served from memory
+            # rather than through read() calls
+            conn.execute('PRAGMA query_only = ON')
+            conn.execute('PRAGMA mmap_size = {:d}'.format(mmap_size))
+            # A negative cache size is in KiB rather than pages
+            conn.execute(
+                'PRAGMA cache_size = -{:d}'.format(cache_size // 1024))
+            conn.execute('PRAGMA temp_store = MEMORY')
+            with lock:
+                connections[key] = conn
+        return conn
+
     def windiris_internal(installation,
                           start_date=None,
                           end_date=None,
@@ -125,19 +214,25 @@ def windiris(root, tzinfo=pytz.utc):
         if not os.path.isfile(f):
             raise ValueError('Installation {} not found'.format(installation))
 
-        conn = sqlite3.connect(f)
-
         if (start_date is not None and start_date.tzinfo is None) or \
                 (end_date is not None and end_date.tzinfo is None):
             raise ValueError('dates must be timezone aware')
 
         return _sqlite(start_date,
                        end_date,
-                       conn,
+                       connect(f),
                        installation,
                        tzinfo,
                        los_id=los_id,
                        distance=distance,
                        status=status)
 
+    def close():
+        with lock:
+            opened = list(connections.values())
+            connections.clear()
+        for conn in opened:
+            conn.close()
+
+    windiris_internal.close = close
     return windiris_internal
@@ -1,37 +1,65 @@
 from azure.identity import AzureCliCredential
-from io import StringIO
-from pytz import utc
+import datetime
 import pandas as pd
+import pytz
 import requests
+import time
 
 
 urljoin = requests.compat.urljoin
 default_host = 'https://resource-zephyre-prod.radix.equinor.com:443'
 default_scope = 'http://zephyre-apiSP-20190313101000'
 
+# The stdlib UTC is cheaper than pytz.utc for pandas to work with, e.g. for
+# the datetime field accessors of the returned index
+utc = datetime.timezone.utc
+
+
+def _normalize_tz(tzinfo):
+    return utc if tzinfo is pytz.utc else tzinfo
+
 
 def isoformat(date):
-    if date.tzinfo != utc:
+    if _normalize_tz(date.tzinfo) is not utc:
         raise ValueError('Dates must be UTC')
-    date = date.replace(tzinfo=None)
-    return date.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    return f'{date:%Y-%m-%dT%H:%M:%S}.{date.microsecond // 1000:03d}Z'
 
 
 def parse_response(strio, tzinfo=utc):
-    df = pd.read_json(strio, orient='records')
+    # The columns are converted explicitly below, so skip read_json's own
+    # dtype and date inference
+    df = pd.read_json(strio,
+                      orient='records',
+                      dtype=False,
+                      convert_dates=False)
+    return _tidy_frame(df, tzinfo)
+
+
+def parse_records(records, tzinfo=utc):
+    """
+    Like parse_response, but for an already decoded list of records
+    """
+    return _tidy_frame(pd.DataFrame.from_records(records), tzinfo)
+
 
+def _tidy_frame(df, tzinfo):
     if df is None or df.empty or 'time' not in df.columns:
         df.drop(df.index, inplace=True)
         df.insert(0, 'time', [])
         df.insert(1, 'value', [])
 
-    df.value = pd.to_numeric(df.value)
-    df.time = pd.to_datetime(df.time, errors='coerce')
-    df.set_index('time', inplace=True)
-    df.index = df.index.tz_localize(tzinfo)
-    df.sort_index(inplace=True)
+    # Build the index and series directly, rather than converting columns in
+    # the frame, moving one of them to the index and localizing a copy
+    time = pd.to_datetime(df['time'].to_numpy(), errors='coerce')
+    index = pd.DatetimeIndex(time, name='time').tz_localize(
+        _normalize_tz(tzinfo))
+    ts = pd.Series(pd.to_numeric(df['value']).to_numpy(),
+                   index=index,
+                   name='value')
+    if not ts.index.is_monotonic_increasing:
+        ts.sort_index(inplace=True)
 
-    return df.value
+    return ts
 
 
 class Zephyre:
@@ -57,6 +85,11 @@ class Zephyre:
     def __init__(self, host=default_host, scope=default_scope):
         self.host = host
         self.scope = scope
+        self._token = None
+        self._token_expires_on = 0
+        # A session keeps the connection to the service alive between calls,
+        # saving a TCP and TLS handshake per request
+        self._session = requests.Session()
 
     def _get_token(self):
         try:
@@ -65,11 +98,16 @@ class Zephyre:
         except Exception as ex:
             raise RuntimeError(str(ex))
 
+        self._token_expires_on = azureToken.expires_on
         return azureToken.token
 
     @property
     def token(self):
-        return self._get_token()
+        # Getting a token shells out to the az cli, so reuse it until it is
+        # about to expire
+        if self._token is None or time.time() > self._token_expires_on - 60:
+            self._token = self._get_token()
+        return self._token
 
     def __call__(self, tag, start_date, end_date, tzinfo=utc):
         """
@@ -81,6 +119,9 @@ class Zephyre:
             The start time of the data to be read. Must be timezone aware
         end_date : datetime.datetime
             The end time of the data to be read. Must be timezone aware
+        tzinfo : datetime.tzinfo, optional
+            Timezone of the returned index. The service reports UTC times,
+            which are converted, not reinterpreted
 
         Returns
         -------
@@ -103,12 +144,12 @@ class Zephyre:
             'start': isoformat(start_date),
             'end': isoformat(end_date),
         }
-        resp = requests.get(url, params=params, headers=headers, stream=True)
+        resp = self._session.get(url, params=params, headers=headers)
         resp.raise_for_status()
 
-        with StringIO() as strio:
-            for data in resp.iter_content(chunk_size=8192):
-                s = data.decode('utf-8')
-                strio.write(s)
-            strio.seek(0)
-            return parse_response(strio)
+        # Decoding the whole body at once avoids splitting multi-byte
+        # characters across chunks, and a copy through a text buffer
+        ts = parse_records(resp.json())
+        if _normalize_tz(tzinfo) is not utc:
+            ts = ts.tz_convert(tzinfo)
+        return ts
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -26,6 +27,60 @@ def rm_dupl_indices(ts):
     return ts[~ts.index.duplicated(keep='first')]
 
 
+def _rm_dupl_sorted(ts):
+    """
+    rm_dupl_indices for a series with a sorted index, where duplicates are
+    adjacent and can be found without hashing the index
+    """
+    if len(ts) == 0:
+        return ts
+
+    index = ts.index
+    if isinstance(index, (pd.DatetimeIndex, pd.TimedeltaIndex)):
+        keys = index.asi8
+    else:
+        keys = index.to_numpy()
+
+    keep = np.empty(len(keys), dtype=bool)
+    keep[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+    return ts[keep]
+
+
+def _can_skip_merge(series, idx):
+    """
+    True if series can be resampled onto idx without merging the two indices,
+    i.e. series is a sorted, unique, float series without holes that can be
+    compared directly with idx
+    """
+    return (
+        isinstance(series.index, pd.DatetimeIndex)
+        and isinstance(idx, pd.DatetimeIndex)
+        and series.index.dtype == idx.dtype
+        and len(series) > 0
+        and series.dtype.kind == 'f'
+        and series.index.is_monotonic_increasing
+        and series.index.is_unique
+        and not idx.hasnans
+        and not series.isna().any()
+    )
+
+
+def _resample_sorted(series, idx, interp):
+    if interp == 'time':
+        # Same interpolation as Series.interpolate(method='time') on the
+        # merged series, which clamps at the end and leaves the targets
+        # before the first sample empty
+        x = idx.asi8
+        xp = series.index.asi8
+        values = np.interp(x, xp, series.to_numpy())
+        values[x < xp[0]] = np.nan
+        return pd.Series(values, index=idx)
+
+    method = 'ffill' if interp == 'prev' else 'bfill'
+    return series.reindex(idx, method=method).rename(None)
+
+
 def resample(series, onto=None, interp='linear'):
     """Resample
 
@@ -104,19 +159,49 @@ def resample(series, onto=None, interp='linear'):
     except AttributeError:
         idx = onto
 
-    ts = (
-        pd.concat([series, pd.Series(index=idx, dtype=series.dtype)])
-        .sort_index(kind='mergesort')
-        )
+    # The general approach merges and sorts both indices. For a well-behaved
+    # series, look the targets up directly where possible
+    supported = (interp in _pandas_supported_interps
+                 or interp in ('prev', 'next'))
+    if supported and _can_skip_merge(series, idx):
+        if np.isin(idx.asi8, series.index.asi8).all():
+            # Every target is a sample, there is nothing to interpolate
+            return series.reindex(idx).rename(None)
+        if interp in ('time', 'prev', 'next'):
+            return _resample_sorted(series, idx, interp)
+
+    # Duplicate samples resolve to the first, as for the targets below.
+    # Dropping them up front keeps them out of the sort and the interpolation
+    if not series.index.is_unique:
+        series = rm_dupl_indices(series)
+
+    if interp == 'linear':
+        # Linear interpolation in pandas is positional, so it keeps the merged
+        # rows as they were, targets overlapping a sample included
+        ts = (
+            pd.concat([series, pd.Series(index=idx, dtype=series.dtype)])
+            .sort_index(kind='mergesort')
+            )
+        ts = ts.interpolate(method=interp)
+        return _rm_dupl_sorted(ts).reindex(idx)
+
+    # The other interpolations only depend on the sample positions, so
+    # reindex onto the merged index rather than building a placeholder series
+    union = series.index.union(idx.unique())
+    if not union.is_monotonic_increasing:
+        # union leaves the index as is when there is nothing to add
+        union = union.sort_values()
+    # The merged series holds NaN where there is no sample. Make it float
+    # up front, or integer series would keep their dtype only when every
+    # target happens to be a sample
+    series = series.astype(np.result_type(series.dtype, np.float64))
+    ts = series.reindex(union).rename(None)
 
     if interp in _pandas_supported_interps:
-        ts = ts.interpolate(method=interp)
-        return rm_dupl_indices(ts).reindex(idx)
+        return ts.interpolate(method=interp).reindex(idx)
     elif interp == 'prev':
-        ts = ts.ffill()
-        return rm_dupl_indices(ts).reindex(idx)
+        return ts.ffill().reindex(idx)
     elif interp == 'next':
-        ts = ts.bfill()
-        return rm_dupl_indices(ts).reindex(idx)
+        return ts.bfill().reindex(idx)
     else:
         raise ValueError('Unsupported interpolation scheme: {}'.format(interp))
@@ -26,14 +26,13 @@ def utcdate(*args, **kwargs):
 
     d = args[0]
 
-    try:
-        # Try to localize the datetime-like. utc.localize will add timezone to
-        # datetime without conversion.
-        return utc.localize(d)
-    except ValueError:
-        # If the datetime-like already has a timezone, localize will raise a
-        # ValueError. Convert the timezone to utc.
-        return d.astimezone(utc)
-    except AttributeError:
+    if not isinstance(d, datetime):
         # The given date-like is not datetime-like, construct a datetime
         return utc.localize(datetime(year=d.year, month=d.month, day=d.day))
+
+    if d.tzinfo is None:
+        # utc.localize will add timezone to datetime without conversion
+        return utc.localize(d)
+
+    # The datetime-like already has a timezone, convert it to utc
+    return d.astimezone(utc)
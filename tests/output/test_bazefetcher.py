@@ -3,6 +3,8 @@ from pytz import utc, timezone
 from camille.output import Bazefetcher as Bazeoutput
 from camille.source import Bazefetcher as Bazesource
 from camille.util import utcdate
+import gzip
+import json
 import numpy as np
 import os
 import pandas as pd
@@ -15,8 +17,7 @@ def assert_correctly_loaded(expected, basedir, t0, t1, tag="test",
     bazein = Bazesource(str(basedir))
     result = bazein(tag, t0, t1)
 
-    new_index = result.index.tz_convert(tzinfo)
-    result = result.reindex(new_index)
+    result = result.tz_convert(tzinfo)
     pd.testing.assert_series_equal(expected, result, check_freq=False)
 
 
@@ -32,8 +33,9 @@ def assert_correct_index(expected_index, basedir, start_date, end_date,
 def assert_correct_raw_values(expected_series, basedir, file_date, tag="test"):
     fname = get_test_fname(file_date, tag)
     path = os.path.join(str(basedir), tag, fname)
-    df = pd.read_json(path)
-    assert np.allclose(df.v.values, expected_series.values)
+    with gzip.open(path, 'rb') as f:
+        values = [record['v'] for record in json.load(f)]
+    assert np.allclose(values, expected_series.values)
 
 
 def get_files_count(basedir, tag="test"):
@@ -79,7 +81,7 @@ def test_one_day_one_file(tmpdir):
     t1 = utcdate(year=2018, month=1, day=1, hour=13)
 
     rng = pd.date_range(t0, t1, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
 
     bazeout = Bazeoutput(str(tmpdir))
@@ -102,6 +104,54 @@ def test_two_days_two_files(tmpdir):
     assert_correctly_loaded(ts, tmpdir, t0, t1)
 
 
+def test_hourly_partition(tmpdir):
+    t0 = utcdate(year=2018, month=1, day=1, hour=10)
+    t1 = utcdate(year=2018, month=1, day=1, hour=13)
+
+    rng = pd.date_range(t0, t1, freq='20T', name="time", closed='left')
+    data = random_data(len(rng))
+    ts = pd.Series(data, name="value", index=rng)
+
+    bazeout = Bazeoutput(str(tmpdir), partition='H')
+    bazeout(ts, "test", t0, t1)
+
+    flist = sorted(os.listdir(os.path.join(str(tmpdir), "test")))
+    assert flist == [
+        "test_2018-01-01T{0:0>2d}.00.00+00.00_2018-01-01T{1:0>2d}.00.00+00.00"
+        ".json.gz".format(h, h + 1)
+        for h in range(10, 13)
+    ]
+    assert_correctly_loaded(ts, tmpdir, t0, t1)
+
+
+def test_mixed_partitions(tmpdir):
+    t0 = utcdate(year=2018, month=1, day=1, hour=10)
+    t1 = utcdate(year=2018, month=1, day=1, hour=13)
+
+    rng = pd.date_range(t0, t1, freq='H', name="time", closed='left')
+    ts = pd.Series(np.arange(len(rng), dtype=float), name="value", index=rng)
+
+    Bazeoutput(str(tmpdir))(ts, "test", t0, t1)
+
+    with pytest.raises(ValueError):
+        Bazeoutput(str(tmpdir), partition='H')(ts, "test", t0, t1)
+
+    assert_files_list(tmpdir, t0, 1)
+    assert_correctly_loaded(ts, tmpdir, t0, t1)
+
+    Bazeoutput(str(tmpdir), partition='H')(ts, "hourly", t0, t1)
+
+    with pytest.raises(ValueError):
+        Bazeoutput(str(tmpdir))(ts, "hourly", t0, t1)
+
+    assert_correctly_loaded(ts, tmpdir, t0, t1, tag="hourly")
+
+
+def test_invalid_partition(tmpdir):
+    with pytest.raises(ValueError):
+        Bazeoutput(str(tmpdir), partition='M')
+
+
 def test_output_interval(tmpdir):
     t_rng_start = get_test_date(1, 12)
     t_rng_end = get_test_date(2, 4)
@@ -199,7 +249,7 @@ def test_multiple_writes_to_same_file(tmpdir):
     t2 = utcdate(year=2018, month=1, day=1, hour=15)
 
     rng = pd.date_range(t0, t2, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
 
     bazeout = Bazeoutput(str(tmpdir))
@@ -217,7 +267,7 @@ def test_multiple_writes_to_same_file_fill(tmpdir):
     t3 = utcdate(year=2018, month=1, day=1, hour=20)
 
     rng = pd.date_range(t0, t3, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
     data2 = data + 1
     ts2 = pd.Series(data2, name="value", index=rng)
@@ -231,13 +281,37 @@ def test_multiple_writes_to_same_file_fill(tmpdir):
         ts[:t1 - eps],
         ts2[t1:t2 - eps],
         ts[t2:]
-    ], sort=True)
+    ])
 
     assert_files_list(tmpdir, t0, 1)
     assert_correctly_loaded(expected, tmpdir, t0, t3)
     assert_correct_raw_values(expected, tmpdir, t0)
 
 
+def test_write_many(tmpdir):
+    t0 = utcdate(year=2018, month=1, day=1, hour=5)
+    t1 = utcdate(year=2018, month=1, day=1, hour=10)
+    t2 = utcdate(year=2018, month=1, day=1, hour=15)
+    t3 = utcdate(year=2018, month=1, day=1, hour=20)
+
+    rng = pd.date_range(t0, t3, freq='H', name="time", closed='left')
+    data = random_data(len(rng))
+    ts = pd.Series(data, name="value", index=rng)
+
+    bazeout = Bazeoutput(str(tmpdir))
+    bazeout.write_many(ts, "test", [(t0, t1), (t2, t3)])
+
+    expected = pd.concat([ts[:t1 - eps], ts[t2:]])
+
+    assert_files_list(tmpdir, t0, 1)
+    assert_correctly_loaded(expected, tmpdir, t0, t3)
+
+    bazeout.write_many(ts + 1, "test", [(t0, t3)], fill=True)
+    expected = pd.concat([ts[:t1 - eps], ts[t1:t2 - eps] + 1, ts[t2:]])
+
+    assert_correctly_loaded(expected, tmpdir, t0, t3)
+
+
 def test_multiple_writes_to_same_file_with_overlap_no_overwrite(tmpdir):
     t0 = utcdate(year=2018, month=1, day=1, hour=5)
     t1 = utcdate(year=2018, month=1, day=1, hour=8)
@@ -245,7 +319,7 @@ def test_multiple_writes_to_same_file_with_overlap_no_overwrite(tmpdir):
     t3 = utcdate(year=2018, month=1, day=1, hour=15)
 
     rng = pd.date_range(t0, t3, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
 
     bazeout = Bazeoutput(str(tmpdir))
@@ -271,7 +345,7 @@ def test_multiple_writes_to_same_file_with_right_overlap_overwrite(tmpdir):
     t3 = utcdate(year=2018, month=1, day=1, hour=15)
 
     rng = pd.date_range(t0, t3, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
     data2 = data + 1
     ts2 = pd.Series(data2, name="value", index=rng)
@@ -280,8 +354,7 @@ def test_multiple_writes_to_same_file_with_right_overlap_overwrite(tmpdir):
     bazeout(ts, "test", t0, t2)
     bazeout(ts2, "test", t1, t3, overwrite=True)
 
-    expected = pd.concat([ts[:(t1-eps)], ts2[t1:]],
-                         sort=True)
+    expected = pd.concat([ts[:(t1-eps)], ts2[t1:]])
     assert_files_list(tmpdir, t0, 1)
     assert_correctly_loaded(expected, tmpdir, t0, t3)
     assert_correct_raw_values(expected, tmpdir, t0)
@@ -294,7 +367,7 @@ def test_multiple_writes_to_same_file_with_left_overlap_overwrite(tmpdir):
     t3 = utcdate(year=2018, month=1, day=1, hour=15)
 
     rng = pd.date_range(t0, t3, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
     data2 = data + 1
     ts2 = pd.Series(data2, name="value", index=rng)
@@ -303,8 +376,7 @@ def test_multiple_writes_to_same_file_with_left_overlap_overwrite(tmpdir):
     bazeout(ts, "test", t1, t3)
     bazeout(ts2, "test", t0, t2, overwrite=True)
 
-    expected = pd.concat([ts2[:(t2-eps)], ts[t2:]],
-                         sort=True)
+    expected = pd.concat([ts2[:(t2-eps)], ts[t2:]])
     assert_files_list(tmpdir, t0, 1)
     assert_correctly_loaded(expected, tmpdir, t0, t3)
     assert_correct_raw_values(expected, tmpdir, t0)
@@ -317,7 +389,7 @@ def test_multiple_writes_to_same_file_with_internal_overlap_overwrite(tmpdir):
     t3 = utcdate(year=2018, month=1, day=1, hour=15)
 
     rng = pd.date_range(t0, t3, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
     data2 = data + 1
     ts2 = pd.Series(data2, name="value", index=rng)
@@ -326,8 +398,7 @@ def test_multiple_writes_to_same_file_with_internal_overlap_overwrite(tmpdir):
     bazeout(ts, "test", t0, t3)
     bazeout(ts2, "test", t1, t2, overwrite=True)
 
-    expected = pd.concat([ts[:t1-eps], ts2[t1:(t2-eps)], ts[t2:]],
-                         sort=True)
+    expected = pd.concat([ts[:t1-eps], ts2[t1:(t2-eps)], ts[t2:]])
     assert_files_list(tmpdir, t0, 1)
     assert_correctly_loaded(expected, tmpdir, t0, t3)
     assert_correct_raw_values(expected, tmpdir, t0)
@@ -338,7 +409,7 @@ def test_multiple_writes_to_same_file_with_full_overlap_overwrite(tmpdir):
     t1 = utcdate(year=2018, month=1, day=1, hour=15)
 
     rng = pd.date_range(t0, t1, freq='H', name="time", closed='left')
-    data = np.random.randn(len(rng))
+    data = random_data(len(rng))
     ts = pd.Series(data, name="value", index=rng)
     data2 = data + 1
     ts2 = pd.Series(data2, name="value", index=rng)
@@ -352,6 +423,12 @@ def test_multiple_writes_to_same_file_with_full_overlap_overwrite(tmpdir):
     assert_correct_raw_values(ts2, tmpdir, t0)
 
 
+def random_data(n):
+    # A fresh seeded generator per call, so a test's data does not depend on
+    # which tests ran before it
+    return np.random.default_rng(0).standard_normal(n)
+
+
 def get_test_date(day, hour=0, minute=0, second=0, year=2018,
                   month=1, tzinfo=utc):
     naive_datetime = datetime(year, month, day, hour, minute, second)
@@ -371,7 +448,7 @@ def get_test_series(start_date=None, end_date=None,
     from the left side.
     """
     rng = get_test_index(start_date, end_date) if rng is None else rng
-    data = np.random.randn(len(rng)) if data is None else data
+    data = random_data(len(rng)) if data is None else data
     return pd.Series(data, name="value", index=rng)
 
 
@@ -1,6 +1,5 @@
 from camille.core import sample_pos
 from camille.util import utcdate
-from datetime import timedelta
 from hypothesis import given, settings
 from hypothesis.strategies import builds, floats, integers
 from itertools import count
@@ -17,6 +16,13 @@ zenith  = [acos(cos(e) * cos(t)) for e, t in zip(elevation, telescope)]
 azimuth = [atan2(sin(e), tan(t)) for e, t in zip(elevation, telescope)]
 lidar_hgt = 100
 
+# Beam directions in the lidar's local frame
+cos_zenith = [cos(zn) for zn in zenith]
+line_of_sight = [
+    np.array([cos(zn), sin(zn) * cos(az), sin(zn) * sin(az), 0])
+    for zn, az in zip(zenith, azimuth)
+]
+
 
 class lidar_simulator:
     def __init__(self, pitch=0, roll=0, surge=0, heave=0,
@@ -33,15 +39,9 @@ class lidar_simulator:
         self.roll_velocity = roll_velocity
         self.yaw_velocity = yaw_velocity
 
-    def __call__(self, windfield, timestamp, distance, beam):
-        d = distance / cos(zenith[beam])
-        zn = zenith[beam]
-        az = azimuth[beam]
-        p = self.pitch
-        r = self.roll
-        surge = self.surge
-        heave = self.heave
-
+        # The lidar does not move during a simulation, so its transform to
+        # world coordinates is the same for every sample
+        p, r = pitch, roll
         T_local = np.array([[1, 0, 0,         0],
                             [0, 1, 0,         0],
                             [0, 0, 1, lidar_hgt],
@@ -54,26 +54,34 @@ class lidar_simulator:
                             [0, 1, 0,     0],
                             [0, 0, 1, heave],
                             [0, 0, 0,     1]])
-        Transform = T_world @ R_world @ T_local
+        self.transform = T_world @ R_world @ T_local
+        # The beams' directions in world coordinates, one column per beam
+        self.line_of_sight = self.transform @ np.column_stack(line_of_sight)
 
-        L = np.array([cos(zn),
-                      sin(zn) * cos(az),
-                      sin(zn) * sin(az),
-                      0])
-        P = d * L + np.array([0, 0, 0, 1])
+    def __call__(self, windfield, timestamp, distance, beam):
+        d = distance / cos_zenith[beam]
+        zn = zenith[beam]
+        az = azimuth[beam]
+        p = self.pitch
+        r = self.roll
+        surge = self.surge
+        heave = self.heave
+        Transform = self.transform
 
-        line_of_sight_direction = Transform @ L
-        measurement_position = Transform @ P
+        # The measurement point is P = d * L + [0, 0, 0, 1], so transforming
+        # it is the scaled line of sight plus the transform's translation
+        line_of_sight_direction = self.line_of_sight[:, beam]
+        measurement_position = d * line_of_sight_direction + Transform[:, 3]
 
         I = np.array([self.surge_velocity, self.sway_velocity,
                       self.heave_velocity])
 
-        Iw = -np.cross(np.array([self.roll_velocity,
-                                 self.pitch_velocity,
-                                 self.yaw_velocity]),
-                       np.array([measurement_position[0],
-                                 measurement_position[1],
-                                 measurement_position[2]]))
+        # -(angular velocity x position), written out for 3-vectors
+        wx, wy, wz = self.roll_velocity, self.pitch_velocity, self.yaw_velocity
+        px, py, pz = measurement_position[:3]
+        Iw = -np.array([wy * pz - wz * py,
+                        wz * px - wx * pz,
+                        wx * py - wy * px])
         # Sanity check
         _ = sample_pos(lidar_hgt, distance, heave, surge, p, r, az, zn)
 
@@ -110,12 +118,18 @@ class windfield_function:
 
     def __call__(self, pnt, inertial_frame=None):
         hgt = pnt[2]
-        spd = self.ref_speed * pow(hgt / lidar_hgt, self.shear)
-        veer_offset = self.veer * (lidar_hgt - hgt)
-        R = np.array([[cos(veer_offset), sin(veer_offset),  0],
-                      [-sin(veer_offset), cos(veer_offset), 0],
-                      [                0,                0, 1]])
-        V = R @ self.direction * spd
+        # Most scenarios have neither shear nor veer, skip the no-op math
+        spd = self.ref_speed
+        if self.shear:
+            spd *= pow(hgt / lidar_hgt, self.shear)
+        if self.veer:
+            # Veer rotates the wind about the vertical axis
+            veer_offset = self.veer * (lidar_hgt - hgt)
+            c, s = cos(veer_offset), sin(veer_offset)
+            dx, dy, dz = self.direction
+            V = np.array([c * dx + s * dy, -s * dx + c * dy, dz]) * spd
+        else:
+            V = self.direction * spd
         if inertial_frame is not None:
             # The wind vector is negative from the lidar's point of view.
             inertial_frame = -inertial_frame
@@ -141,17 +155,20 @@ def generate_input(windfield,
                    distance,
                    n=4,
                    start_date=utcdate(year=2030, month=1, day=1, hour=12)):
-    df = pd.DataFrame(columns=[
+    columns = [
         'los_id', 'radial_windspeed', 'status', 'surge', 'heave', 'pitch',
         'roll', 'surge_velocity', 'sway_velocity', 'heave_velocity',
         'pitch_velocity', 'roll_velocity', 'yaw_velocity'
-    ])
+    ]
 
-    time = (start_date + timedelta(seconds=1) * i for i in range(n))
+    rows = []
+    time = pd.date_range(start_date, periods=n, freq='S')
     beam = (i % 4 for i in count())
     for t, b in zip(time, beam):
-        timestamp, *xs = lidar(windfield, t, distance, b)
-        df.loc[timestamp] = xs
+        _, *xs = lidar(windfield, t, distance, b)
+        rows.append(xs)
+
+    df = pd.DataFrame(rows, index=time, columns=columns, dtype=float)
     return distance, windfield, lidar, df
 
 
@@ -206,12 +223,12 @@ def scenario(case,
         dist, windfield, _, df = args
         processed = process_with_args(dist, df)
 
+        # approx compares every element of an array against the reference
         p = np.array([dist, 0, lidar_hgt])
-        for _, row in processed.iterrows():
-            assert row.hws == ref_speed(windfield, p)
-            assert row.shear == ref_shear(windfield)
-            assert row.veer == ref_veer(windfield)
-            assert row.hwd == ref_direction(windfield)
+        assert processed.hws.to_numpy() == ref_speed(windfield, p)
+        assert processed.shear.to_numpy() == ref_shear(windfield)
+        assert processed.veer.to_numpy() == ref_veer(windfield)
+        assert processed.hwd.to_numpy() == ref_direction(windfield)
     return test
 
 
@@ -148,3 +148,35 @@ def test_array_params():
                      t=0)
 
     assert np.allclose(result, expected)
+
+
+def test_unordered_breakpoints():
+    # The segments intersect at log S = 15, beyond the end point at 12
+    x = [1e-5, 1, 1e3]
+    expected = [7.19685673e63, 2.68269580e37, 3.72759372e21]
+
+    result = sncurve(x, logA=[10, 40], m=[3, 5], k=0, tref=25, t=0)
+
+    assert np.allclose(result, expected)
+
+
+def test_extrapolation():
+    # Outside the end points the end segments continue as straight lines
+    logA, m = [12.192, 16.32], [3.0, 5.0]
+    x = [1e-10, 1e13]
+    expected = [10 ** (logA[1] + m[1] * 10), 10 ** (logA[0] - m[0] * 13)]
+
+    result = sncurve(x, logA=logA, m=m, k=0, tref=25, t=0)
+
+    assert np.allclose(result, expected)
+
+
+def test_extrapolation_unordered_breakpoints():
+    # Breakpoints at log S = -9, 12 and 15 once sorted, so the extrapolation
+    # continues from the outermost segments of the sorted curve
+    x = [1e-10, 1e16]
+    expected = [1.93069773e90, 1e-38]
+
+    result = sncurve(x, logA=[10, 40], m=[3, 5], k=0, tref=25, t=0)
+
+    assert np.allclose(result, expected)
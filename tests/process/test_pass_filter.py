@@ -2,7 +2,7 @@
 import pandas as pd
 import numpy as np
 from numpy import pi
-from scipy.fftpack import fft
+from scipy.fft import rfft
 from scipy.signal import find_peaks
 from camille import process
 
@@ -24,8 +24,8 @@ def _pass_filter(filter_func, cutoff):
     ps = filter_func(s, sampling_rate, cutoff, order=10)
 
     half_samples = n_samples // 2
-    orig_freqs = np.abs(fft(s.values)[0:half_samples])
-    ps_freqs = np.abs(fft(ps.values)[0:half_samples])
+    orig_freqs = np.abs(rfft(s.values)[0:half_samples])
+    ps_freqs = np.abs(rfft(ps.values)[0:half_samples])
 
     min_peak_h = 10
     orig_peaks, _ = find_peaks(orig_freqs, height=min_peak_h)
@@ -132,6 +132,21 @@ def test_non_existing_tag():
         baze('non-existing-tag', t1_1, t1_1_1)
     assert 'Tag non-existing-tag not found' in str(excinfo.value)
 
+def test_contains():
+    baze_and_authored = Bazefetcher(
+        paths=['tests/test_data/authored', 'tests/test_data/baze'])
+    assert 'Sin-T60s-SR01hz' in baze_and_authored
+    assert 'installation-04-status' in baze_and_authored
+    assert 'non-existing-tag' not in baze_and_authored
+
+    resolved = baze_and_authored._resolve_tags(
+        ['installation-04-status', 'Sin-T60s-SR01hz', 'non-existing-tag'])
+    assert resolved == {
+        'installation-04-status': baze_and_authored.srcs[0],
+        'Sin-T60s-SR01hz': baze_and_authored.srcs[1],
+    }
+
+
 def test_no_time_zone():
     t1_3_notz = datetime(2030, 1, 3)
     with pytest.raises(ValueError) as excinfo0: baze('Perlin', t1_3_notz, t1_5)
@@ -2,7 +2,10 @@
 from camille.source import windiris
 from datetime import datetime
 from pytz import timezone, utc
+from unittest.mock import patch
 import pytest
+import sqlite3
+import threading
 
 wi = windiris('tests/test_data/windiris')
 
@@ -116,6 +119,86 @@ def test_timezone():
 
     assert df.index.tz == data_tzinfo
 
+def test_close():
+    opened = []
+    sqlite3_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        conn = sqlite3_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    wi = windiris('tests/test_data/windiris')
+    with patch('camille.source.windiris.sqlite3.connect', side_effect=connect):
+        first = wi('inst2', db_start_datetime, db_end_datetime)
+        second = wi('inst2', db_start_datetime, db_end_datetime)
+        assert first.equals(second)
+        assert len(opened) == 1
+
+        wi.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute('SELECT 1')
+
+        df = wi('inst2', db_start_datetime, db_end_datetime)
+        assert df.equals(first)
+        assert len(opened) == 2
+        wi.close()
+
+def test_close_threads():
+    opened = []
+    sqlite3_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        conn = sqlite3_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    # Thread ids are reused once a thread exits, so keep all of them alive
+    # until each has read
+    barrier = threading.Barrier(4)
+
+    def read():
+        wi('inst2', db_start_datetime, db_end_datetime)
+        barrier.wait()
+
+    wi = windiris('tests/test_data/windiris')
+    with patch('camille.source.windiris.sqlite3.connect', side_effect=connect):
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(opened) == 4
+
+        wi.close()
+        for conn in opened:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute('SELECT 1')
+
+def test_memory_limits():
+    opened = []
+    sqlite3_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        conn = sqlite3_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    wi = windiris('tests/test_data/windiris',
+                  mmap_size=2**20,
+                  cache_size=2**21)
+    with patch('camille.source.windiris.sqlite3.connect', side_effect=connect):
+        wi('inst2', db_start_datetime, db_end_datetime)
+        conn, = opened
+        assert conn.execute('PRAGMA cache_size').fetchone() == (-2048,)
+        mmap_size, = conn.execute('PRAGMA mmap_size').fetchone()
+        assert mmap_size <= 2**20
+        wi.close()
+
+def test_negative_memory_limit():
+    with pytest.raises(ValueError):
+        windiris('tests/test_data/windiris', mmap_size=-1)
+
 def test_not_directory():
     with pytest.raises(ValueError) as exc:
         windiris('tests/test_data/windiris/inst1/inst1_rtd.db.gz')
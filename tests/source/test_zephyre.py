@@ -4,8 +4,11 @@ from camille.util import utcdate
 from io import StringIO
 from unittest.mock import patch
 import datetime
+import json
 import pandas as pd
+import pytz
 import requests
+import time
 
 
 bz = Bazefetcher('tests/test_data/baze')
@@ -35,14 +38,12 @@ class MockResponse:
         if (self.status_code != 200):
             raise requests.HTTPError('Mock error')
 
-    def iter_content(self, chunk_size):
-        for i in range(0, len(self.json_bytes), chunk_size):
-            yield self.json_bytes[i:i + chunk_size]
+    def json(self):
+        return json.loads(self.json_bytes)
 
-# This method will be used by the mock to replace requests.get
-def requests_get_mock(url, params={}, headers={}, stream=False):
+# This method will be used by the mock to replace requests.Session.get
+def requests_get_mock(url, params={}, headers={}):
     assert headers['Authorization'] == 'Bearer token'
-    assert stream
     assert 'measurementName' in params
     assert 'start' in params
     assert 'end' in params
@@ -63,10 +64,52 @@ def test_Zephyre_source():
     with patch(
         'camille.source.zephyre.Zephyre._get_token', return_value='token'
     ), patch(
-        'camille.source.zephyre.requests.get',
+        'camille.source.zephyre.requests.Session.get',
         side_effect=requests_get_mock,
     ):
         result = z('Sin-T60s-SR01hz', start_date, end_date)
     reference = bz('Sin-T60s-SR01hz', start_date, end_date)
 
     pd.testing.assert_series_equal(result, reference)
+
+
+def test_Zephyre_source_tzinfo():
+    start_date = utcdate(year=2030, month=1, day=1)
+    end_date = utcdate(year=2030, month=1, day=2)
+    oslo = pytz.timezone('Europe/Oslo')
+
+    z = Zephyre()
+
+    with patch(
+        'camille.source.zephyre.Zephyre._get_token', return_value='token'
+    ), patch(
+        'camille.source.zephyre.requests.Session.get',
+        side_effect=requests_get_mock,
+    ):
+        result = z('Sin-T60s-SR01hz', start_date, end_date, tzinfo=oslo)
+    reference = bz('Sin-T60s-SR01hz', start_date, end_date)
+
+    assert str(result.index.tz) == 'Europe/Oslo'
+    assert (result.index == reference.index).all()
+    pd.testing.assert_series_equal(result.tz_convert(pytz.utc), reference)
+
+
+def test_token_is_cached():
+    z = Zephyre()
+
+    class AccessToken:
+        def __init__(self, token, expires_on):
+            self.token = token
+            self.expires_on = expires_on
+
+    with patch('camille.source.zephyre.AzureCliCredential') as credential:
+        get_token = credential.return_value.get_token
+        get_token.return_value = AccessToken('first', time.time() + 3600)
+        assert z.token == 'first'
+        assert z.token == 'first'
+        assert get_token.call_count == 1
+
+        get_token.return_value = AccessToken('second', time.time() + 3600)
+        z._token_expires_on = time.time() + 30
+        assert z.token == 'second'
+        assert get_token.call_count == 2
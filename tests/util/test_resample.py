@@ -47,3 +47,30 @@ def test_resample_next():
     sr_n = resample(s2, onto=sh.index[1:], interp='next')
     assert sr_n[sr_n.index <= d1].all()
     assert sr_n[sr_n.index > d1].isna().all()
+
+
+def test_resample_duplicate_timestamps_keep_first():
+    t = [d0 + dt.timedelta(minutes=m) for m in (0, 10, 10, 20)]
+    s = pd.Series([0.0, 10.0, 100.0, 20.0], index=t)
+    first = s.iloc[[0, 1, 3]]
+    idx = pd.DatetimeIndex([d0 + dt.timedelta(minutes=15)])
+
+    expected = {'time': 15.0, 'nearest': 10.0, 'prev': 10.0, 'next': 20.0}
+    for interp, value in expected.items():
+        assert resample(s, onto=idx, interp=interp)[0] == value
+
+    for interp in ['linear', 'time', 'nearest', 'slinear', 'zero', 'prev']:
+        pd.testing.assert_series_equal(
+            resample(s, onto=idx, interp=interp),
+            resample(first, onto=idx, interp=interp),
+        )
+
+
+def test_resample_int_series_aligned_targets():
+    s = pd.Series(np.arange(len(rng_d)), index=rng_d)
+    idx = rng_d[::2]
+
+    for interp in ['linear', 'time', 'nearest', 'prev', 'next']:
+        b = resample(s, onto=idx, interp=interp)
+        assert b.dtype == np.float64
+        np.testing.assert_array_equal(b.values, np.arange(len(rng_d))[::2])